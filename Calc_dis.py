@@ -1,23 +1,14 @@
-import originpro as op
 import pandas as pd
 
-# 1. Загрузка данных
-data = pd.read_csv("ZE15_250_Ag_dis.csv")
-ws = op.new_sheet('w')
-ws.from_df(data)
+from blitz.fitting import get_backend
 
-# 2. Настройка аппроксимации
-fit = op.NLFit('ExpDecay1')
-fit.set_data(ws, 0, 1)  # X=0, Y=1
+if __name__ == '__main__':
+    # 1. Загрузка данных
+    data = pd.read_csv("ZE15_250_Ag_dis.csv")
 
-# 3. Фиксация параметров (ключевая часть!)
-fit.fix_param('y0', 0)       # Жестко фиксируем y0=0
-fit.set_param('A', 1.0)      # Начальное значение амплитуды
-fit.set_param('t1', 5.0)     # Начальное время затухания
+    # 2. Аппроксимация ExpDecay1 с фиксированным y0=0
+    backend = get_backend()
+    result = backend.fit_exp_decay(data, fixed_y0=0)
 
-# 5. Запуск аппроксимации
-fit.fit()
-
-# 6. Вывод результатов
-result = fit.result()
-print(f"t1 = {result['t1']:.4f} ± {result['e_t1']:.4f}")
+    # 3. Вывод результатов
+    print(f"t1 = {result['t1']:.4f} ± {result['t1_error']:.4f}")
@@ -0,0 +1,6 @@
+"""Обработка и подгонка кривых BLItz
+
+Ядро (preprocess, correction, split, fitting) не импортирует matplotlib и
+originpro: графики (blitz.plotting) и бэкенд Origin (blitz.origin_backend)
+загружаются только по требованию.
+"""
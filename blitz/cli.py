@@ -0,0 +1,210 @@
+import argparse
+
+# Здесь только argparse: тяжёлые модули импортируются внутри команд,
+# чтобы `--help` отвечал сразу.
+
+
+def _cmd_preprocess(args):
+    from blitz.preprocess import process_data
+    process_data(args.input, args.output, plot=not args.no_plot)
+
+
+def _cmd_plate(args):
+    import os
+    from blitz.correction import BASELINE_WINDOW
+    from blitz.preprocess import process_plate
+    outputs = [os.path.join(args.output_dir, os.path.basename(path)) for path in args.inputs]
+    references = args.reference
+    if references is not None and len(references) == 1:
+        references = references[0]
+    baseline = BASELINE_WINDOW if args.baseline is None else tuple(args.baseline)
+    try:
+        process_plate(args.inputs, outputs, references, baseline)
+    except (ValueError, OSError) as e:
+        print(f"❌ Ошибка: {str(e)}")
+        return 1
+
+
+def _cmd_split(args):
+    from blitz.split import split_folder
+    split_folder(args.input_dir, args.as_dir, args.dis_dir)
+
+
+def _selection(args):
+    if args.criterion == 'r2':
+        return 'r2'
+    return {'criterion': args.criterion, 'min_coverage': args.min_coverage,
+            'patience': args.patience or None, 'margin': args.margin}
+
+
+def _add_selection_arguments(p):
+    p.add_argument('--criterion', choices=('chi2', 'aicc', 'r2'), default='chi2',
+                   help="критерий выбора окна (r2 — прежний максимум R² по всем окнам)")
+    p.add_argument('--min-coverage', type=float, default=0.25,
+                   help="минимальная длительность окна как доля самого длинного (0 — все окна)")
+    p.add_argument('--margin', type=float, default=0.1,
+                   help="оценки, отличающиеся от лучшей не больше чем на margin, равноценны; "
+                        "из них берётся самое длинное окно")
+    p.add_argument('--patience', type=int, default=0,
+                   help="остановить перебор после N подгонок без улучшения; приближение, "
+                        "может изменить выбор (0 — перебрать все, по умолчанию)")
+
+
+def _cmd_fit_as(args):
+    from blitz.fitting import fit_folder
+    fit_folder(args.folder, args.output, 'as', backend=args.backend,
+               diagnostics_dir=args.diagnostics_dir,
+               time_max_fraction=args.time_max_fraction,
+               num_variations=args.variations, min_points=args.min_points,
+               selection=_selection(args))
+
+
+def _cmd_fit_dis(args):
+    from blitz.fitting import fit_folder
+    fit_folder(args.folder, args.output, 'dis', backend=args.backend,
+               diagnostics_dir=args.diagnostics_dir,
+               time_min_range=tuple(args.time_min), time_max_range=tuple(args.time_max),
+               num_variations=args.variations, min_points=args.min_points,
+               selection=_selection(args))
+
+
+def _report_traces(sources):
+    """{имя: DataFrame или путь к CSV} из папок с CSV и книг вида plots_Cl.xlsx"""
+    import os
+    import pandas as pd
+    from blitz.report import read_legacy_traces
+    traces = {}
+    for source in sources:
+        if os.path.isdir(source):
+            # Здесь читаются только заголовки: write_report загружает CSV по блокам
+            for name in sorted(os.listdir(source)):
+                path = os.path.join(source, name)
+                if name.endswith('.csv') and 'Time (s)' in pd.read_csv(path, nrows=0).columns:
+                    traces[name] = path
+        else:
+            traces.update(read_legacy_traces(source))
+    return traces
+
+
+def _cmd_report(args):
+    import pandas as pd
+    from blitz.report import read_legacy_kd, read_legacy_results, write_report
+    if (args.dis_results is None) != (args.as_results is None):
+        print("❌ Ошибка: нужны оба CSV результатов (dis_results и as_results)")
+        return 1
+    if args.dis_results is None and not args.legacy_workbook:
+        print("❌ Ошибка: нужны CSV результатов или --legacy-workbook")
+        return 1
+    dis_frames, as_frames = [], []
+    if args.dis_results is not None:
+        dis_frames.append(pd.read_csv(args.dis_results))
+        as_frames.append(pd.read_csv(args.as_results))
+    for path in args.legacy_workbook or ():
+        dis_results, as_results = read_legacy_results(path)
+        dis_frames.append(dis_results)
+        as_frames.append(as_results)
+    traces = _report_traces(args.traces) if args.traces else None
+    legacy_kd = read_legacy_kd(args.legacy_kd) if args.legacy_kd else None
+    write_report(args.output, pd.concat(dis_frames, ignore_index=True),
+                 pd.concat(as_frames, ignore_index=True),
+                 traces=traces, charts=args.charts, legacy_kd=legacy_kd)
+    print(f"Отчёт сохранён в {args.output}")
+
+
+def _cmd_serve(args):
+    from blitz.service import serve
+    serve(args.host, args.port, args.db, args.workers)
+
+
+def _cmd_startup(args):
+    from blitz.startup import heavy_modules_loaded_by_core, measure_startup
+    for name, seconds in measure_startup(args.repeat).items():
+        print(f"{name:>12}: {seconds * 1000:.0f} мс")
+    heavy = heavy_modules_loaded_by_core()
+    if heavy:
+        print(f"❌ Ядро загружает тяжёлые модули: {', '.join(heavy)}")
+        return 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='blitz', description="Обработка и подгонка кривых BLItz")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('preprocess', help="очистка, обрезка и сшивка одной кривой")
+    p.add_argument('input')
+    p.add_argument('output')
+    p.add_argument('--no-plot', action='store_true', help="не рисовать результат")
+    p.set_defaults(func=_cmd_preprocess)
+
+    p = sub.add_parser('plate', help="коррекция планшета: референс и дрейф базовой линии")
+    p.add_argument('output_dir', help="папка результатов (не папка исходных CSV)")
+    p.add_argument('inputs', nargs='+')
+    p.add_argument('--reference', nargs='+', help="один буферный сенсор или по одному на образец")
+    p.add_argument('--baseline', nargs=2, type=float, default=None, metavar=('START', 'END'),
+                   help="окно базовой линии, с (по умолчанию 0 30)")
+    p.set_defaults(func=_cmd_plate)
+
+    p = sub.add_parser('split', help="деление кривых на ассоциацию и диссоциацию")
+    p.add_argument('input_dir')
+    p.add_argument('as_dir')
+    p.add_argument('dis_dir')
+    p.set_defaults(func=_cmd_split)
+
+    p = sub.add_parser('fit-as', help="подгонка ассоциации (y0 свободен)")
+    p.add_argument('folder', nargs='?', default='.')
+    p.add_argument('-o', '--output', default='fit_results_varied_max_time.csv')
+    p.add_argument('--backend', default='native', help="native, native-association или origin")
+    p.add_argument('--time-max-fraction', type=float, default=0.25)
+    p.add_argument('--variations', type=int, default=20)
+    p.add_argument('--min-points', type=int, default=20)
+    p.add_argument('--diagnostics-dir',
+                   help="сохранить все окна каждого файла (.npz); при ранней остановке "
+                        "(--patience N) непройденные окна в картах R² пустые")
+    _add_selection_arguments(p)
+    p.set_defaults(func=_cmd_fit_as)
+
+    p = sub.add_parser('fit-dis', help="подгонка диссоциации (y0 = 0)")
+    p.add_argument('folder', nargs='?', default='.')
+    p.add_argument('-o', '--output', default='fit_results_fixed_y0_optimized_range.csv')
+    p.add_argument('--backend', default='native', help="native, native-association или origin")
+    p.add_argument('--time-min', nargs=2, type=float, default=[0, 10], metavar=('MIN', 'MAX'))
+    p.add_argument('--time-max', nargs=2, type=float, default=[30, 119], metavar=('MIN', 'MAX'))
+    p.add_argument('--variations', type=int, default=20)
+    p.add_argument('--min-points', type=int, default=10)
+    p.add_argument('--diagnostics-dir',
+                   help="сохранить все окна каждого файла (.npz); при ранней остановке "
+                        "(--patience N) непройденные окна в картах R² пустые")
+    _add_selection_arguments(p)
+    p.set_defaults(func=_cmd_fit_dis)
+
+    p = sub.add_parser('report', help="сводная книга Excel с kon/koff/Kd")
+    p.add_argument('dis_results', nargs='?', help="CSV результатов fit-dis")
+    p.add_argument('as_results', nargs='?', help="CSV результатов fit-as")
+    p.add_argument('-o', '--output', default='Kd_report.xlsx')
+    p.add_argument('--legacy-workbook', action='append', metavar='XLSX',
+                   help="ручная книга вида Cl.xlsx/ag.xlsx как источник подгонок (можно повторять)")
+    p.add_argument('--traces', action='append', metavar='DIR|XLSX',
+                   help="папка с CSV кривых или книга вида plots_Cl.xlsx (можно повторять)")
+    p.add_argument('--legacy-kd', metavar='XLSX',
+                   help="прежняя таблица Kd (ZE_Kd.xlsx) для листа comparison_legacy")
+    p.add_argument('--charts', action='store_true', help="добавить диаграммы Excel")
+    p.set_defaults(func=_cmd_report)
+
+    p = sub.add_parser('serve', help="локальный HTTP-сервис подгонки с очередью задач")
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8765)
+    p.add_argument('--db', default='blitz_jobs.sqlite', help="файл очереди задач (SQLite)")
+    p.add_argument('--workers', type=int, help="число рабочих процессов (по умолчанию — число ядер)")
+    p.set_defaults(func=_cmd_serve)
+
+    p = sub.add_parser('startup', help="замер времени запуска и проверка лёгкости ядра")
+    p.add_argument('--repeat', type=int, default=5)
+    p.set_defaults(func=_cmd_startup)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args) or 0
@@ -0,0 +1,60 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+
+class FittingClient:
+    """Клиент локального сервиса подгонки (blitz.service)"""
+
+    def __init__(self, url='http://127.0.0.1:8765', timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read()).get('error', e.reason)
+            raise RuntimeError(f"Ошибка сервиса ({e.code}): {message}") from None
+
+    def submit(self, traces, phase, options=None, backend='native'):
+        """Отправляет кривые на подгонку
+
+        traces -- словарь {имя файла: DataFrame с 'Time (s)', 'Binding (nm)'}
+        phase  -- 'as' или 'dis'; options — параметры fit_association/fit_dissociation.
+        Возвращает ответ сервиса: {'id', 'status', 'duplicate'}.
+        """
+        payload = {
+            'phase': phase,
+            'backend': backend,
+            'options': options or {},
+            'traces': [{'filename': name,
+                        'time': df['Time (s)'].tolist(),
+                        'binding': df['Binding (nm)'].tolist()}
+                       for name, df in traces.items()],
+        }
+        return self._request('POST', '/jobs', payload)
+
+    def status(self, job_id):
+        return self._request('GET', f'/jobs/{job_id}')
+
+    def wait(self, job_id, timeout=600, poll_interval=0.5):
+        """Ждёт завершения задачи и возвращает список лучших подгонок"""
+        deadline = time.time() + timeout
+        while True:
+            job = self.status(job_id)
+            if job['status'] == 'done':
+                return job['result']
+            if job['status'] == 'failed':
+                raise RuntimeError(f"Задача {job_id} завершилась с ошибкой: {job['error']}")
+            if time.time() > deadline:
+                raise TimeoutError(f"Задача {job_id} не завершилась за {timeout} с")
+            time.sleep(poll_interval)
+
+    def metrics(self):
+        return self._request('GET', '/metrics')
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+TIME_COL = 'Time (s)'
+SIGNAL_COL = 'Binding (nm)'
+
+# Окно базовой линии до ассоциации (секунды в исходных данных)
+BASELINE_WINDOW = (0, 30)
+
+
+def common_time_grid(traces):
+    """Строит общую временную сетку для всех кривых планшета
+
+    Берутся отсчёты первой кривой в общем для всех диапазоне времени, чтобы
+    сохранить пропуски прибора (например, между 29.8 и 30.2 с).
+    """
+    t_start = max(df[TIME_COL].iloc[0] for df in traces)
+    t_end = min(df[TIME_COL].iloc[-1] for df in traces)
+    if t_start >= t_end:
+        raise ValueError("Кривые не перекрываются по времени")
+
+    t = traces[0][TIME_COL].to_numpy()
+    return t[(t >= t_start) & (t <= t_end)]
+
+
+def stack_traces(traces, time_grid):
+    """Собирает кривые в массив (n_кривых, n_точек) на общей сетке"""
+    signals = np.empty((len(traces), len(time_grid)))
+    for i, df in enumerate(traces):
+        t = df[TIME_COL].to_numpy()
+        y = df[SIGNAL_COL].to_numpy()
+        if len(t) == len(time_grid) and np.allclose(t, time_grid):
+            signals[i] = y
+        else:
+            signals[i] = np.interp(time_grid, t, y)
+    return signals
+
+
+def subtract_reference(signals, references):
+    """Вычитает референсные кривые (буфер/референсный сенсор) из образцов"""
+    references = np.atleast_2d(references)
+    if references.shape[0] not in (1, signals.shape[0]):
+        raise ValueError("Число референсных кривых не совпадает с числом образцов")
+    return signals - references
+
+
+def remove_baseline_drift(time_grid, signals, window=BASELINE_WINDOW):
+    """Аппроксимирует линейный дрейф в окне до ассоциации и вычитает его"""
+    mask = (time_grid >= window[0]) & (time_grid < window[1])
+    if mask.sum() < 2:
+        raise ValueError(f"Недостаточно точек в окне базовой линии {window}")
+
+    # Одна линейная регрессия сразу для всех кривых
+    slopes, intercepts = np.polyfit(time_grid[mask], signals[:, mask].T, 1)
+    drift = slopes[:, None] * time_grid[None, :] + intercepts[:, None]
+    return signals - drift, slopes
+
+
+def correct_plate(samples, references=None, baseline_window=BASELINE_WINDOW):
+    """Коррекция планшета: вычитание референса и дрейфа базовой линии
+
+    samples    -- список DataFrame после load_and_clean_csv
+    references -- None, один DataFrame (общий буферный сенсор) или список
+                  DataFrame той же длины, что и samples
+    Возвращает список DataFrame того же формата и наклоны дрейфа (нм/с).
+    """
+    samples = list(samples)
+    if isinstance(references, pd.DataFrame):
+        references = [references]
+    references = list(references) if references is not None else []
+    if len(references) not in (0, 1, len(samples)):
+        raise ValueError("Число референсных кривых не совпадает с числом образцов")
+
+    time_grid = common_time_grid(samples + references)
+    signals = stack_traces(samples, time_grid)
+
+    if references:
+        signals = subtract_reference(signals, stack_traces(references, time_grid))
+
+    if baseline_window is not None:
+        signals, slopes = remove_baseline_drift(time_grid, signals, baseline_window)
+    else:
+        slopes = np.zeros(len(samples))
+
+    signals = np.round(signals, 9)
+    corrected = [pd.DataFrame({TIME_COL: time_grid, SIGNAL_COL: row}) for row in signals]
+    return corrected, slopes
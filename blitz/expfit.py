@@ -0,0 +1,207 @@
+import numpy as np
+
+# Экспоненциальная подгонка методом проекции переменных (variable projection).
+#
+# Модель y = y0 + A*g(t), где g = exp(-t/t1) ('decay', ExpDecay1) или
+# g = 1 - exp(-t/t1) ('association'). При фиксированном t1 параметры y0 и A
+# линейны и находятся в замкнутом виде, поэтому остаётся одномерная задача
+# по k = 1/t1. Она решается Гаусса-Ньютоном по ln k с аналитическим якобианом
+# (приближение Кауфмана) после грубого векторного перебора по сетке k.
+
+MODELS = ('decay', 'association')
+
+GRID_POINTS = 48  # Точек в начальной сетке по k
+# Подгонка считается упёршейся в границу, если ln k ближе к ней, чем на
+# ln 10: t1 > 100 длительностей окна (затухание в окне < 1%, т.е. прямая)
+# или t1 < шага по времени. Градиент по ln k у границы почти нулевой, и
+# Гаусс-Ньютон останавливается, не дойдя до неё точно.
+BOUND_MARGIN = np.log(10)
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-10
+
+
+def _shape(t, k, model):
+    """g(t) и dg/dk для модели"""
+    e = np.exp(-k * t)
+    if model == 'decay':
+        return e, -t * e
+    return 1 - e, t * e
+
+
+def _linear_fit(g, y, free_y0):
+    """Линейные параметры (y0, A) в замкнутом виде; None — вырожденный случай"""
+    sgg = g @ g
+    sgy = g @ y
+    if not free_y0:
+        if sgg <= 0:
+            return None
+        return 0.0, sgy / sgg
+    n = len(y)
+    sg = g.sum()
+    sy = y.sum()
+    det = n * sgg - sg * sg
+    if det <= 1e-12 * n * sgg:
+        return None
+    A = (n * sgy - sg * sy) / det
+    return (sy - A * sg) / n, A
+
+
+def _project_out(d, g, free_y0):
+    """Компонента d, ортогональная базису модели ({1, g} или {g})"""
+    coef = _linear_fit(g, d, free_y0)
+    if coef is None:
+        return d
+    return d - coef[0] - coef[1] * g
+
+
+def _grid_start(t, y, free_y0, model, k_grid):
+    """Векторный перебор по сетке k: индекс k с минимальной суммой квадратов"""
+    e = np.exp(-np.outer(k_grid, t))
+    G = e if model == 'decay' else 1 - e
+    sgg = np.einsum('ij,ij->i', G, G)
+    sgy = G @ y
+    syy = y @ y
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if free_y0:
+            n = len(y)
+            sg = G.sum(axis=1)
+            sy = y.sum()
+            det = n * sgg - sg * sg
+            A = (n * sgy - sg * sy) / det
+            y0 = (sy - A * sg) / n
+            rss = syy - y0 * sy - A * sgy
+            rss[det <= 1e-12 * n * sgg] = np.inf
+        else:
+            rss = syy - sgy ** 2 / sgg
+    rss = np.where(np.isfinite(rss), rss, np.inf)
+    return int(np.argmin(rss))
+
+
+def fit_exp(t, y, fixed_y0=None, model='decay'):
+    """Аппроксимирует y0 + A*g(t) с g = exp(-t/t1) или 1 - exp(-t/t1)
+
+    fixed_y0 -- None (y0 подбирается) или фиксированное значение y0.
+    Возвращает словарь t1, t1_error, A, A_error, y0, y0_error, R_squared,
+    Iterations, RSS, N, DW (Дарбин-Уотсон), AtBound или None, если задача
+    вырождена. Погрешности — стандартные ошибки из ковариационной матрицы
+    s²(JᵀJ)⁻¹. t1 ограничен
+    1000 длительностями окна: для кривых без затухания (где Origin выдавал
+    t1 ~ 1e17) возвращается эта граница. AtBound = True, если k у границы
+    диапазона (BOUND_MARGIN): такая подгонка — не экспонента, а прямая.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Неизвестная модель: {model}")
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    free_y0 = fixed_y0 is None
+    n_params = 3 if free_y0 else 2
+    if len(t) <= n_params:
+        return None
+    yw = y if free_y0 else y - fixed_y0
+
+    # Диапазон k: от t1 = 1000 длительностей окна до t1 = шага по времени / 10
+    span = t.max() - t.min()
+    step = np.median(np.diff(np.sort(t)))
+    if span <= 0 or step <= 0:
+        return None
+    theta_min, theta_max = np.log(1e-3 / span), np.log(10 / step)
+    k_grid = np.exp(np.linspace(theta_min, theta_max, GRID_POINTS))
+
+    theta = np.log(k_grid[_grid_start(t, yw, free_y0, model, k_grid)])
+
+    def evaluate(theta):
+        k = np.exp(theta)
+        g, dg = _shape(t, k, model)
+        coef = _linear_fit(g, yw, free_y0)
+        if coef is None:
+            return None
+        r = yw - coef[0] - coef[1] * g
+        return k, g, dg, coef, r, r @ r
+
+    state = evaluate(theta)
+    if state is None:
+        return None
+
+    iterations = 0
+    for iterations in range(1, MAX_ITERATIONS + 1):
+        k, g, dg, coef, r, rss = state
+        # Якобиан остатков по ln k (Кауфман): проекция A*k*dg/dk вне базиса
+        J = _project_out(coef[1] * k * dg, g, free_y0)
+        JJ = J @ J
+        if JJ <= 0:
+            break
+        delta = (J @ r) / JJ
+
+        # Шаг с дроблением, пока сумма квадратов не уменьшится
+        new_state = None
+        while abs(delta) > TOLERANCE:
+            new_theta = min(max(theta + delta, theta_min), theta_max)
+            candidate = evaluate(new_theta)
+            if candidate is not None and candidate[5] <= rss:
+                new_state = candidate
+                break
+            delta /= 2
+
+        if new_state is None:
+            break
+        converged = abs(new_theta - theta) < TOLERANCE or rss - new_state[5] <= TOLERANCE * rss
+        theta, state = new_theta, new_state
+        if converged:
+            break
+
+    k, g, dg, (y0, A), r, rss = state
+    at_bound = bool(theta < theta_min + BOUND_MARGIN or theta > theta_max - BOUND_MARGIN)
+    t1 = 1 / k
+    if not free_y0:
+        y0 = fixed_y0
+
+    # Аналитический якобиан модели по (y0, A, t1): dk/dt1 = -1/t1²
+    columns = [g, -A * dg / t1 ** 2]
+    if free_y0:
+        columns.insert(0, np.ones_like(t))
+    jac = np.column_stack(columns)
+    dof = len(t) - n_params
+    try:
+        cov = np.linalg.inv(jac.T @ jac) * (rss / dof)
+        errors = np.sqrt(np.clip(np.diag(cov), 0, None))
+    except np.linalg.LinAlgError:
+        errors = np.full(n_params, np.nan)
+    if free_y0:
+        y0_error, A_error, t1_error = errors
+    else:
+        y0_error, (A_error, t1_error) = None, errors
+
+    tss = np.sum((y - y.mean()) ** 2)
+    # Статистика Дарбина-Уотсона по уже посчитанным остаткам
+    dw = np.sum(np.diff(r) ** 2) / rss if rss > 0 else 2.0
+    return {
+        't1': float(t1),
+        't1_error': float(t1_error),
+        'A': float(A),
+        'A_error': float(A_error),
+        'y0': float(y0),
+        'y0_error': None if y0_error is None else float(y0_error),
+        'R_squared': float(1 - rss / tss) if tss > 0 else None,
+        'Iterations': iterations,
+        'RSS': float(rss),
+        'N': len(t),
+        'DW': float(dw),
+        'AtBound': at_bound,
+    }
+
+
+class ExpFitBackend:
+    """Бэкенд подгонки без Origin: проекция переменных (fit_exp)"""
+
+    name = 'native'
+
+    def __init__(self, model='decay'):
+        self.model = model
+
+    def fit_exp_decay(self, df, fixed_y0=None):
+        """Аппроксимирует кривую y0 + A*exp(-t/t1); y0 можно зафиксировать"""
+        return self.fit_arrays(df.iloc[:, 0].to_numpy(), df.iloc[:, 1].to_numpy(), fixed_y0)
+
+    def fit_arrays(self, t, y, fixed_y0=None):
+        """То же по массивам numpy (без создания DataFrame для каждого окна)"""
+        return fit_exp(t, y, fixed_y0=fixed_y0, model=self.model)
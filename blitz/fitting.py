@@ -0,0 +1,164 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from blitz.results import FitResults
+from blitz.selection import make_selection, noise_dw, noise_variance, select_best
+
+AS_RESULT_COLUMNS = ['Filename', 't1', 't1_error', 'A', 'A_error', 'y0', 'y0_error',
+                     'R_squared', 'Iterations', 'Time_min', 'Time_max', 'AtBound']
+DIS_RESULT_COLUMNS = ['Filename', 't1', 't1_error', 'A', 'A_error', 'Fixed_y0', 'R_squared',
+                      'Iterations', 'Time_min', 'Time_max', 'AtBound']
+
+# Бэкенды подгонки: имя -> (модуль, класс, аргументы). Модуль импортируется
+# только при первом обращении, чтобы ядро не тянуло originpro.
+BACKENDS = {
+    'native': ('blitz.expfit', 'ExpFitBackend', {}),
+    'native-association': ('blitz.expfit', 'ExpFitBackend', {'model': 'association'}),
+    'origin': ('blitz.origin_backend', 'OriginBackend', {}),
+}
+
+
+def get_backend(name='native'):
+    """Создаёт бэкенд подгонки по имени (импорт модуля — по требованию)"""
+    if not isinstance(name, str):
+        return name
+    if name not in BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд подгонки: {name}")
+    import importlib
+    module_name, class_name, kwargs = BACKENDS[name]
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+
+
+def fit_windows(backend, data, windows, filename, fixed_y0=None, min_points=10, selection=None):
+    """Аппроксимирует кривую в окнах и возвращает FitResults с оценкой Score
+
+    selection -- WindowSelection, имя критерия или словарь его параметров.
+    Слишком короткие окна отбрасываются; если задана ранняя остановка
+    (patience), окна перебираются от длинных к коротким до плато оценки. Окна с
+    недостаточным числом точек пропускаются, неудачные подгонки сохраняются
+    как NaN.
+    """
+    selection = make_selection(selection)
+    time = data['Time (s)'].to_numpy()
+    binding = data.iloc[:, 1].to_numpy()
+    if selection.criterion == 'r2':
+        noise_var, baseline_dw = None, 2.0
+    else:
+        noise_var, baseline_dw = noise_variance(binding), noise_dw(binding)
+    n_params = 3 if fixed_y0 is None else 2
+    fit_arrays = getattr(backend, 'fit_arrays', None)
+
+    ordered = selection.order(windows)
+    results = FitResults(filename, fixed_y0, capacity=max(len(ordered), 1))
+    plateau = selection.plateau()
+    for time_min, time_max in ordered:
+        # Фильтрация данных
+        mask = (time >= time_min) & (time <= time_max)
+        if mask.sum() < min_points:
+            continue
+        try:
+            if fit_arrays is not None:
+                params = fit_arrays(time[mask], binding[mask], fixed_y0)
+            else:
+                params = backend.fit_exp_decay(data[mask], fixed_y0=fixed_y0)
+        except Exception as e:
+            warnings.warn(
+                f"Ошибка при time_min={time_min:.2f}, time_max={time_max:.2f} для файла {filename}: {str(e)}")
+            params = None
+        score = selection.score(params, n_params, noise_var, baseline_dw)
+        results.append(time_min, time_max, params, score)
+        if plateau(score):
+            break
+    return results
+
+
+def fit_association(data, filename, backend, time_min=0, time_max_fraction=0.25,
+                    num_variations=20, min_points=20, selection=None):
+    """Ассоциация: y0 свободен, варьируется конечное время окна (FitResults)"""
+    full_time_max = data['Time (s)'].max()
+    time_max_options = np.linspace(full_time_max * time_max_fraction, full_time_max, num_variations)
+    windows = [(time_min, time_max) for time_max in time_max_options]
+    return fit_windows(backend, data, windows, filename, None, min_points, selection)
+
+
+def fit_dissociation(data, filename, backend, time_min_range=(0, 10), time_max_range=(30, 119),
+                     num_variations=20, min_points=10, fixed_y0=0, selection=None):
+    """Диссоциация: y0 фиксирован, варьируются начальное и конечное время окна (FitResults)"""
+    time_min_options = np.linspace(*time_min_range, num_variations)
+    time_max_options = np.linspace(*time_max_range, num_variations)
+    # Только комбинации, где time_min < time_max
+    windows = [(time_min, time_max) for time_min in time_min_options
+               for time_max in time_max_options if time_min < time_max]
+    return fit_windows(backend, data, windows, filename, fixed_y0, min_points, selection)
+
+
+def fit_folder(input_folder, output_file, phase, backend='native', diagnostics_dir=None, **options):
+    """Подгоняет все CSV в папке и сохраняет лучшие результаты
+
+    phase -- 'as' (fit_association) или 'dis' (fit_dissociation);
+    diagnostics_dir -- если задан, все окна каждого файла сохраняются туда
+    как <имя>_windows.npz (FitResults.load) для карт R²;
+    options передаются в соответствующую функцию.
+    """
+    fit_trace, cols = {
+        'as': (fit_association, AS_RESULT_COLUMNS),
+        'dis': (fit_dissociation, DIS_RESULT_COLUMNS),
+    }[phase]
+    backend = get_backend(backend)
+
+    # Создаем список для хранения результатов
+    results = []
+
+    # Получаем список CSV-файлов в папке
+    csv_files = [f for f in os.listdir(input_folder) if f.endswith('.csv')]
+
+    try:
+        for filename in csv_files:
+            try:
+                print(f"\nОбработка файла: {filename}")
+
+                # Чтение данных
+                data = pd.read_csv(os.path.join(input_folder, filename))
+
+                # Проверяем наличие нужных столбцов
+                if 'Time (s)' not in data.columns or len(data.columns) < 2:
+                    warnings.warn(f"Файл {filename} не содержит нужных столбцов. Пропускаем.")
+                    continue
+
+                windows = fit_trace(data, filename, backend, **options)
+                if diagnostics_dir is not None:
+                    stem = os.path.splitext(filename)[0]
+                    windows.save(os.path.join(diagnostics_dir, f"{stem}_windows.npz"))
+
+                # Лучшее окно по оценке Score — векторно по столбцам FitResults
+                best_fit = select_best(windows, options.get('selection'))
+
+                if best_fit:
+                    results.append(best_fit)
+                    print(f"Лучший результат для {filename}: R²={best_fit['R_squared']:.4f}, "
+                          f"t1={best_fit['t1']:.4f}, диапазон {best_fit['Time_min']:.2f}-{best_fit['Time_max']:.2f} "
+                          f"({len(windows)} подгонок)")
+                else:
+                    warnings.warn(f"Не удалось выполнить аппроксимацию для файла {filename}")
+
+            except Exception as e:
+                warnings.warn(f"Ошибка при обработке файла {filename}: {str(e)}")
+    finally:
+        close = getattr(backend, 'close', None)
+        if close is not None:
+            close()
+
+    # Сохраняем все результаты в CSV
+    if results:
+        # Упорядочиваем столбцы
+        results_df = pd.DataFrame(results)[cols]
+        results_df.to_csv(output_file, index=False)
+        print(f"\nРезультаты сохранены в {output_file}")
+        print(results_df)
+        return results_df
+
+    print("\nНе удалось обработать ни один файл")
+    return None
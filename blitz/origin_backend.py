@@ -0,0 +1,98 @@
+import numpy as np
+import originpro as op
+
+# Параметры могут называться по-разному в разных версиях Origin
+PARAM_NAMES = {
+    'y0': ['y0'],
+    'A': ['A', 'A1', 'amplitude'],
+    't1': ['t1', 'tau1']
+}
+
+
+def _get_param(result, names, default=None):
+    """Безопасно извлекает параметр по одному из альтернативных имён"""
+    for name in names:
+        if name in result:
+            return result[name]
+    return default
+
+
+def _residual_stats(df, params):
+    """RSS, N и статистика Дарбина-Уотсона по остаткам подгонки Origin"""
+    if params['t1'] is None or params['A'] is None or params['y0'] is None:
+        return {}
+    t = df.iloc[:, 0].to_numpy(dtype=float)
+    y = df.iloc[:, 1].to_numpy(dtype=float)
+    r = y - params['y0'] - params['A'] * np.exp(-t / params['t1'])
+    rss = float(r @ r)
+    return {'RSS': rss, 'N': len(t), 'DW': float(np.sum(np.diff(r) ** 2) / rss) if rss > 0 else 2.0}
+
+
+class OriginBackend:
+    """Подгонка ExpDecay1 через Origin (NLFit)"""
+
+    name = 'origin'
+
+    def __init__(self):
+        # Проверяем доступность Origin
+        if not op.oext:
+            raise RuntimeError("Не удалось подключиться к Origin")
+
+    def fit_exp_decay(self, df, fixed_y0=None):
+        """Аппроксимирует кривую y0 + A*exp(-t/t1); y0 можно зафиксировать"""
+        # Загрузка данных в Origin
+        op.new_book()
+        ws = op.find_sheet()
+        ws.from_df(df)
+
+        fit = op.NLFit('ExpDecay1')
+        fit.set_data(ws, 0, 1)  # Столбцы X (0) и Y (1)
+
+        # Установка начальных параметров
+        y_data = df.iloc[:, 1].tolist()
+        if fixed_y0 is None:
+            y0_guess = y_data[-1] if len(y_data) > 0 else 0
+        else:
+            y0_guess = fixed_y0
+        A_guess = y_data[0] - y0_guess if len(y_data) > 0 else 1
+
+        # Пытаемся установить параметры разными способами
+        result = None
+        for a_name in PARAM_NAMES['A']:
+            try:
+                params = {a_name: A_guess, PARAM_NAMES['t1'][0]: 5.0}
+                if fixed_y0 is None:
+                    params[PARAM_NAMES['y0'][0]] = y0_guess
+                fit.parameters = params
+                if fixed_y0 is not None:
+                    fit.fix_param('y0', fixed_y0)
+                fit.fit()
+                result = fit.result()
+                break
+            except Exception:
+                continue
+
+        if result is None:
+            return None
+
+        if fixed_y0 is None:
+            y0 = _get_param(result, PARAM_NAMES['y0'])
+            y0_error = _get_param(result, ['e_' + n for n in PARAM_NAMES['y0']])
+        else:
+            y0, y0_error = fixed_y0, None
+
+        params = {
+            't1': _get_param(result, PARAM_NAMES['t1']),
+            't1_error': _get_param(result, ['e_' + n for n in PARAM_NAMES['t1']]),
+            'A': _get_param(result, PARAM_NAMES['A']),
+            'A_error': _get_param(result, ['e_' + n for n in PARAM_NAMES['A']]),
+            'y0': y0,
+            'y0_error': y0_error,
+            'R_squared': result.get('r', 0) ** 2 if 'r' in result else None,
+            'Iterations': result.get('niter', 0),
+        }
+        params.update(_residual_stats(df, params))
+        return params
+
+    def close(self):
+        op.exit()
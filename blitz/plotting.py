@@ -0,0 +1,22 @@
+import matplotlib.pyplot as plt
+
+
+def show_trace(df):
+    """Рисует кривую связывания"""
+    plt.plot(df['Time (s)'], df['Binding (nm)'])
+    plt.xlabel('Time (s)')
+    plt.ylabel('Binding (nm)')
+    plt.show()
+
+
+def plot_fit_surface(results, key='R_squared', ax=None):
+    """Рисует карту key по окнам подгонки (Time_min × Time_max) из FitResults"""
+    time_min, time_max, grid = results.surface(key)
+    if ax is None:
+        ax = plt.gca()
+    mesh = ax.pcolormesh(time_max, time_min, grid, shading='nearest')
+    ax.set_xlabel('Time_max (s)')
+    ax.set_ylabel('Time_min (s)')
+    ax.set_title(f"{results.filename}: {key}")
+    plt.colorbar(mesh, ax=ax, label=key)
+    return ax
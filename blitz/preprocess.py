@@ -0,0 +1,142 @@
+import os
+
+import pandas as pd
+
+from blitz.correction import BASELINE_WINDOW, correct_plate
+
+
+def adjust_data_continuity(df):
+    """Корректирует данные после 120 секунд для плавного перехода"""
+    # Находим значения в моменты 119.6 и 120 секунд
+    value_119_6 = df.loc[df['Time (s)'].round(1) == 119.6, 'Binding (nm)'].values
+    value_120 = df.loc[df['Time (s)'].round(1) == 120.4, 'Binding (nm)'].values
+
+    if len(value_119_6) == 0 or len(value_120) == 0:
+        raise ValueError("Не найдены значения для 119.6 или 120.0 секунд")
+
+    # Вычисляем разницу для коррекции
+    adjustment = value_119_6[0] - value_120[0]
+
+    # Применяем коррекцию ко всем данным после 120 секунд
+    mask = df['Time (s)'] >= 120
+    df.loc[mask, 'Binding (nm)'] = round(df.loc[mask, 'Binding (nm)'] + adjustment, 9)
+
+    return df, adjustment
+
+def load_and_clean_csv(filepath):
+    """Загружает и очищает CSV с особым форматом"""
+    with open(filepath, 'r') as f:
+        # Читаем заголовок
+        header = f.readline().strip()
+
+        # Читаем остальные строки, пропуская некорректные
+        data = []
+        for line in f:
+            parts = line.strip().split(',')
+            if len(parts) == 2:  # Только строки с 2 значениями
+                try:
+                    time = float(parts[0].strip())
+                    binding = float(parts[1].strip())
+                    data.append([time, binding])
+                except ValueError:
+                    continue
+
+    # Создаем DataFrame
+    df = pd.DataFrame(data, columns=['Time (s)', 'Binding (nm)'])
+    return df
+
+
+def normalize_trace(df, debug=False):
+    """Обрезает, нормализует и сшивает кривую после загрузки
+
+    debug -- сохранять промежуточные debug_02/debug_03 CSV в текущую папку
+    """
+    # 2. Фильтрация по времени (30-270 сек)
+    filtered = df[(df['Time (s)'] >= 30) & (df['Time (s)'] < 270)].copy()
+    if debug:
+        filtered.to_csv("debug_02_filtered.csv", index=False)
+
+    if len(filtered) == 0:
+        raise ValueError("Нет данных в диапазоне 30-270 секунд!")
+
+    # 3. Нормализация времени (начинаем с 0)
+    filtered['Time (s)'] = round((filtered['Time (s)'] - 30.2),2 )
+
+    # 4. Нормализация сигнала (начинаем с 0)
+    first_signal = filtered['Binding (nm)'].iloc[0]
+    filtered['Binding (nm)'] = round((filtered['Binding (nm)'] - first_signal), 9)
+    if debug:
+        filtered.to_csv("debug_03_normalized.csv", index=False)
+
+    # Корректировка непрерывности
+    return adjust_data_continuity(filtered)
+
+
+def process_data(input_file, output_file, plot=True):
+    try:
+        # 1. Загрузка и очистка
+        df = load_and_clean_csv(input_file)
+        df.to_csv("debug_01_cleaned.csv", index=False)
+
+        adjusted_df, adj_value = normalize_trace(df, debug=True)
+        print(f"Применена коррекция: {adj_value:.6f} нм")
+
+        # Сохранение
+        adjusted_df.to_csv(output_file, index=False)
+        print(f"Данные сохранены в {output_file}")
+
+        # 6. Рисуем (matplotlib загружается только здесь)
+        if plot:
+            from blitz.plotting import show_trace
+            show_trace(adjusted_df)
+
+    except Exception as e:
+        print(f"❌ Ошибка: {str(e)}")
+
+
+def check_plate_outputs(input_files, output_files, reference_files=None):
+    """Не даёт перезаписать исходные CSV прибора или один результат другим"""
+    if len(output_files) != len(input_files):
+        raise ValueError("Число выходных файлов не совпадает с числом входных")
+    if reference_files is None:
+        reference_files = []
+    elif isinstance(reference_files, (str, os.PathLike)):
+        reference_files = [reference_files]
+    sources = {os.path.realpath(path) for path in [*input_files, *reference_files]}
+    seen = set()
+    for path in output_files:
+        real = os.path.realpath(path)
+        if real in sources:
+            raise ValueError(f"Выходной файл совпадает с исходным: {path}")
+        if real in seen:
+            raise ValueError(f"Выходной файл повторяется (одинаковые имена входных файлов): {path}")
+        seen.add(real)
+
+
+def process_plate(input_files, output_files, reference_files=None,
+                  baseline_window=BASELINE_WINDOW):
+    """Обрабатывает весь планшет: вычитание референса и дрейфа, затем нормализация
+
+    reference_files -- None, путь к одному буферному сенсору для всего планшета
+                       или список путей, по одному на каждый образец
+    Ошибки не перехватываются: при сбое исключение уходит вызывающему (CLI
+    возвращает ненулевой код), исходные файлы не перезаписываются.
+    """
+    check_plate_outputs(input_files, output_files, reference_files)
+
+    # 1. Загрузка и очистка
+    samples = [load_and_clean_csv(path) for path in input_files]
+    if reference_files is None:
+        references = None
+    elif isinstance(reference_files, (str, os.PathLike)):
+        references = load_and_clean_csv(reference_files)
+    else:
+        references = [load_and_clean_csv(path) for path in reference_files]
+
+    # 1a. Вычитание референса и дрейфа базовой линии (все кривые сразу)
+    corrected, slopes = correct_plate(samples, references, baseline_window)
+
+    for df, slope, output_file in zip(corrected, slopes, output_files):
+        adjusted_df, adj_value = normalize_trace(df)
+        adjusted_df.to_csv(output_file, index=False)
+        print(f"Дрейф: {slope:.2e} нм/с, коррекция: {adj_value:.6f} нм -> {output_file}")
@@ -0,0 +1,347 @@
+import os
+import re
+from itertools import zip_longest
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.chart import BarChart, Reference, ScatterChart, Series
+from openpyxl.utils import get_column_letter
+
+# Имя файла вида ZE15_1000_Ag_dis.csv: образец, концентрация, анион, фаза
+FILENAME_PATTERN = re.compile(
+    r'(?P<sample>ZE_?\d+)_(?P<conc>\d+)(?:_(?P<anion>[A-Za-z0-9]+))?_(?P<phase>as|dis)',
+    re.IGNORECASE)
+# Для группировки кривых фаза не обязательна: ZE_15_1000, ZE26_250_Cl.csv
+TRACE_PATTERN = re.compile(
+    r'(?P<sample>ZE_?\d+)_(?P<conc>\d+)'
+    r'(?:_(?!(?:as|dis)(?:\W|_|$))(?P<anion>[A-Za-z0-9]+))?(?:_(?P<phase>as|dis))?',
+    re.IGNORECASE)
+
+DIS_COLUMNS = ['Filename', 'Concentration', 't1', 't1_error', 'A', 'A_error', 'Fixed_y0',
+               'R_squared', 'Iterations', 'Time_min', 'Time_max']
+AS_COLUMNS = ['Filename', 'Concentration', 't1', 't1_error', 'A', 'A_error', 'y0', 'y0_error',
+              'R_squared', 'Iterations', 'Time_min', 'Time_max']
+KINETICS_COLUMNS = ['Sample', 'Anion', 'Concentration', 'koff', 'koff_rel_error',
+                    'kobs', 'kobs_rel_error', 'kon', 'Kd', 'Kd_error']
+
+# Метка для кривых без аниона в имени (например, ZE15_1000_dis.csv)
+NO_ANION = '-'
+
+
+def parse_filename(filename):
+    """Разбирает имя файла на образец, концентрацию, анион и фазу"""
+    match = FILENAME_PATTERN.search(os.path.basename(filename))
+    if match is None:
+        raise ValueError(f"Не удалось разобрать имя файла: {filename}")
+    return (match['sample'].upper().replace('_', ''), int(match['conc']),
+            match['anion'] or NO_ANION, match['phase'].lower())
+
+
+def _with_keys(results):
+    """Добавляет к результатам подгонки столбцы Sample/Concentration/Anion"""
+    keys = [parse_filename(name) for name in results['Filename']]
+    out = results.copy()
+    out['Sample'] = [k[0] for k in keys]
+    out['Concentration'] = [k[1] for k in keys]
+    out['Anion'] = [k[2] for k in keys]
+    return out
+
+
+def _fit_columns(results, columns):
+    """Столбцы листа подгонки; AtBound — если он есть (в ручных книгах его нет)"""
+    return columns + ['AtBound'] * ('AtBound' in results.columns) + ['Anion']
+
+
+def _valid_t1(results):
+    """t1 и t1_error, где подгонки с t1 на границе решателя (AtBound) заменены NaN"""
+    out = results[['Sample', 'Concentration', 'Anion', 't1', 't1_error']].copy()
+    if 'AtBound' in results.columns:
+        at_bound = results['AtBound'].fillna(False).astype(bool).to_numpy()
+        out.loc[at_bound, ['t1', 't1_error']] = np.nan
+    return out
+
+
+def kinetics_table(dis_results, as_results):
+    """Считает koff, kon и Kd по парам диссоциация/ассоциация
+
+    Формулы повторяют ручные таблицы Cl.xlsx и ag.xlsx:
+    koff = 1/t1(dis), kobs = 1/t1(as), kon = (koff + kobs)/C, Kd = koff/kon,
+    погрешность Kd = Kd * (Eотн(dis) + Eотн(as)).
+    Для подгонок с AtBound (кривая без затухания) Kd не считается (NaN).
+    """
+    keys = ['Sample', 'Concentration', 'Anion']
+    dis = _valid_t1(_with_keys(dis_results))
+    ass = _valid_t1(_with_keys(as_results))
+    merged = dis.merge(ass, on=keys, suffixes=('_dis', '_as'))
+
+    koff = 1 / merged['t1_dis'].to_numpy(dtype=float)
+    kobs = 1 / merged['t1_as'].to_numpy(dtype=float)
+    e_dis = merged['t1_error_dis'].to_numpy(dtype=float) * koff
+    e_as = merged['t1_error_as'].to_numpy(dtype=float) * kobs
+    kon = (koff + kobs) / merged['Concentration'].to_numpy(dtype=float)
+    kd = koff / kon
+
+    table = pd.DataFrame({
+        'Sample': merged['Sample'],
+        'Anion': merged['Anion'],
+        'Concentration': merged['Concentration'],
+        'koff': koff,
+        'koff_rel_error': e_dis,
+        'kobs': kobs,
+        'kobs_rel_error': e_as,
+        'kon': kon,
+        'Kd': kd,
+        'Kd_error': kd * (e_dis + e_as),
+    })
+    return table.sort_values(['Sample', 'Anion', 'Concentration']).reset_index(drop=True)
+
+
+def sample_summary(kinetics):
+    """Средние kon/koff/Kd по образцу и аниону (по всем концентрациям)
+
+    Погрешность среднего как в ag.xlsx: sqrt(сумма квадратов) / число точек.
+    Концентрации без Kd (AtBound) в среднее не входят.
+    """
+    def _combine(group):
+        group = group.dropna(subset=['Kd'])
+        return pd.Series({
+            'koff': group['koff'].mean(),
+            'kon': group['kon'].mean(),
+            'Kd': group['Kd'].mean(),
+            'Kd_error': np.sqrt(np.sum(group['Kd_error'] ** 2)) / len(group),
+            'N': len(group),
+        })
+
+    grouped = kinetics.groupby(['Sample', 'Anion'], sort=True)[['koff', 'kon', 'Kd', 'Kd_error']]
+    return grouped.apply(_combine).reset_index()
+
+
+def comparison_table(summary):
+    """Таблица сравнения анионов как в ZE_Kd.xlsx: строка на образец, Kd и ± по анионам"""
+    pivot = summary.pivot(index='Sample', columns='Anion', values=['Kd', 'Kd_error'])
+    anions = list(pivot.columns.levels[1])
+    table = pd.DataFrame(index=pivot.index)
+    for anion in anions:
+        table[f'Kd {anion}'] = pivot[('Kd', anion)]
+        table[f'± {anion}'] = pivot[('Kd_error', anion)]
+    return table.reset_index()
+
+
+def _clean(value):
+    """Приводит значения numpy/pandas к типам, понятным openpyxl"""
+    if value is None:
+        return None
+    if isinstance(value, (np.floating, float)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+def _write_frame(ws, df):
+    """Построчно пишет DataFrame в лист (write_only — память не растёт)"""
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        ws.append([_clean(v) for v in row])
+
+
+def _trace_blocks(traces):
+    """Группирует кривые по образцу: {образец: [(имя, источник), ...]}
+
+    Источник — DataFrame или путь к CSV; файлы здесь не читаются.
+    """
+    blocks = {}
+    for name, source in traces.items():
+        match = TRACE_PATTERN.search(os.path.basename(name))
+        if match is not None:
+            sample = match['sample'].upper().replace('_', '')
+        else:
+            sample = os.path.splitext(os.path.basename(name))[0]
+        blocks.setdefault(sample, []).append((name, source))
+    return blocks
+
+
+def _load_trace(source):
+    """DataFrame кривой: уже загруженный или прочитанный из CSV"""
+    if isinstance(source, pd.DataFrame):
+        return source
+    return pd.read_csv(source)
+
+
+def _write_trace_block(ws, sample, items, charts):
+    """Пишет блок образца «Time (s), кривые...» как в plots_Cl.xlsx
+
+    Кривые блока читаются только здесь, поэтому в памяти одновременно один
+    блок. Общий столбец времени берётся у первой кривой; кривые с другой
+    сеткой интерполируются на неё (вне своего диапазона — пусто).
+    """
+    header, columns, grid = ['Time (s)'], [], None
+    for name, source in items:
+        df = _load_trace(source)
+        time = df['Time (s)'].to_numpy(dtype=float)
+        binding = df['Binding (nm)'].to_numpy(dtype=float)
+        if grid is None:
+            grid = time
+            columns.append(grid)
+        elif len(time) != len(grid) or not np.allclose(time, grid):
+            order = np.argsort(time)
+            binding = np.interp(grid, time[order], binding[order], left=np.nan, right=np.nan)
+        header.append(os.path.splitext(os.path.basename(name))[0])
+        columns.append(binding)
+
+    ws.append(header)
+    n_rows = 1
+    for row in zip_longest(*columns):
+        ws.append([_clean(v) for v in row])
+        n_rows += 1
+
+    if charts:
+        chart = ScatterChart()
+        chart.title = sample
+        chart.style = 13
+        chart.x_axis.title = 'Time (s)'
+        chart.y_axis.title = 'Binding (nm)'
+        x = Reference(ws, min_col=1, min_row=2, max_row=n_rows)
+        for col in range(2, len(header) + 1):
+            y = Reference(ws, min_col=col, min_row=1, max_row=n_rows)
+            series = Series(y, x, title_from_data=True)
+            series.marker.symbol = 'none'
+            chart.series.append(series)
+        ws.add_chart(chart, f'{get_column_letter(len(header) + 2)}2')
+
+
+def write_report(path, dis_results, as_results, traces=None, charts=False, legacy_kd=None):
+    """Собирает сводную книгу Excel по результатам подгонки
+
+    Листы: fits_dis, fits_as (подгонка по файлам), kinetics (kon/koff/Kd по
+    образцу и концентрации), summary (средние по образцу), comparison
+    (сравнение анионов, как ZE_Kd.xlsx), comparison_legacy (прежняя таблица
+    Kd, если передана legacy_kd) и по листу traces_<образец> на каждый образец.
+    traces -- словарь {имя файла: DataFrame или путь к CSV с 'Time (s)',
+    'Binding (nm)'}; CSV читаются по одному блоку образца, поэтому память
+    ограничена самым большим блоком, а не всеми кривыми.
+    """
+    kinetics = kinetics_table(dis_results, as_results)
+    summary = sample_summary(kinetics)
+    comparison = comparison_table(summary)
+
+    wb = Workbook(write_only=True)
+    _write_frame(wb.create_sheet('fits_dis'),
+                 _with_keys(dis_results)[_fit_columns(dis_results, DIS_COLUMNS)])
+    _write_frame(wb.create_sheet('fits_as'),
+                 _with_keys(as_results)[_fit_columns(as_results, AS_COLUMNS)])
+    _write_frame(wb.create_sheet('kinetics'), kinetics[KINETICS_COLUMNS])
+    _write_frame(wb.create_sheet('summary'), summary)
+
+    ws = wb.create_sheet('comparison')
+    _write_frame(ws, comparison)
+    if charts and len(comparison):
+        chart = BarChart()
+        chart.title = 'Kd'
+        chart.y_axis.title = 'Kd'
+        categories = Reference(ws, min_col=1, min_row=2, max_row=len(comparison) + 1)
+        for col in range(2, comparison.shape[1] + 1, 2):
+            data = Reference(ws, min_col=col, min_row=1, max_row=len(comparison) + 1)
+            chart.add_data(data, titles_from_data=True)
+        chart.set_categories(categories)
+        ws.add_chart(chart, f'{get_column_letter(comparison.shape[1] + 2)}2')
+
+    if legacy_kd is not None:
+        _write_frame(wb.create_sheet('comparison_legacy'), legacy_kd)
+
+    if traces:
+        for sample, items in _trace_blocks(traces).items():
+            # Имя листа Excel: не длиннее 31 символа и без []:*?/\\
+            title = re.sub(r'[\[\]:*?/\\]', '_', f'traces_{sample}')[:31]
+            _write_trace_block(wb.create_sheet(title), sample, items, charts)
+
+    wb.save(path)
+    return kinetics, summary, comparison
+
+
+def _read_blocks(ws):
+    """Читает лист с таблицами, разделёнными пустыми строками; заголовок — 'Filename'"""
+    blocks, header, rows = [], None, []
+    for row in ws.iter_rows(values_only=True):
+        if row and row[0] == 'Filename':
+            if header is not None:
+                blocks.append((header, rows))
+            header, rows = row, []
+        elif header is not None and row and row[0] is not None:
+            rows.append(row)
+    if header is not None:
+        blocks.append((header, rows))
+    return blocks
+
+
+def read_legacy_results(path):
+    """Читает ручную книгу вида Cl.xlsx / ag.xlsx в (dis_results, as_results)
+
+    Берутся только исходные столбцы подгонки; формулы (koff, kon, Kd...)
+    пересчитываются через kinetics_table.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        blocks = _read_blocks(wb.worksheets[0])
+    finally:
+        wb.close()
+
+    frames = {}
+    for header, rows in blocks:
+        # Второй столбец без заголовка — концентрация
+        names = ['Concentration' if i == 1 and name is None else name
+                 for i, name in enumerate(header)]
+        wanted = [(i, name) for i, name in enumerate(names)
+                  if name in DIS_COLUMNS or name in AS_COLUMNS]
+        df = pd.DataFrame([[row[i] for i, _ in wanted] for row in rows],
+                          columns=[name for _, name in wanted])
+        phase = parse_filename(df['Filename'].iloc[0])[3]
+        frames[phase] = df
+    return frames.get('dis'), frames.get('as')
+
+
+def read_legacy_traces(path):
+    """Читает книгу кривых вида plots_Cl.xlsx в словарь {имя: DataFrame}"""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows)
+        values = np.array([[np.nan if v is None else v for v in row[:len(header)]]
+                           for row in rows], dtype=float)
+    finally:
+        wb.close()
+
+    traces, time_col = {}, None
+    for i, name in enumerate(header):
+        if name is None:
+            time_col = None
+        elif name == 'Time (s)':
+            time_col = i
+        elif time_col is not None:
+            mask = ~np.isnan(values[:, time_col]) & ~np.isnan(values[:, i])
+            traces[name] = pd.DataFrame({'Time (s)': values[mask, time_col],
+                                         'Binding (nm)': values[mask, i]})
+    return traces
+
+
+def read_legacy_kd(path):
+    """Читает ZE_Kd.xlsx: строка на образец, пары столбцов (Kd, ±) по анионам"""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = list(wb.worksheets[0].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+    anions = [(i, name) for i, name in enumerate(rows[0]) if name is not None]
+    records = []
+    for row in rows[1:]:
+        if row[0] is None:
+            continue
+        record = {'Sample': row[0]}
+        for i, anion in anions:
+            record[f'Kd {anion}'] = row[i]
+            record[f'± {anion}'] = row[i + 1]
+        records.append(record)
+    return pd.DataFrame(records)
+
@@ -0,0 +1,152 @@
+import numpy as np
+
+# Столбцы результатов подгонки по окну и их типы
+FIT_DTYPE = np.dtype([
+    ('t1', 'f8'),
+    ('t1_error', 'f8'),
+    ('A', 'f8'),
+    ('A_error', 'f8'),
+    ('y0', 'f8'),
+    ('y0_error', 'f8'),
+    ('R_squared', 'f8'),
+    ('Iterations', 'i4'),
+    ('Time_min', 'f8'),
+    ('Time_max', 'f8'),
+    ('RSS', 'f8'),
+    ('N', 'i4'),
+    ('DW', 'f8'),
+    ('Score', 'f8'),
+    ('AtBound', '?'),
+])
+
+# Целочисленные и логические столбцы: пропуск записывается как 0 (False)
+_INT_COLUMNS = ('Iterations', 'N', 'AtBound')
+
+
+class FitResults:
+    """Результаты подгонки всех окон одного файла, по столбцам
+
+    Каждый столбец — отдельный непрерывный массив numpy, поэтому хранение
+    тысяч окон дешево, выбор лучшего окна векторный, а to_pandas/to_parquet
+    не копируют данные. Неудачные подгонки хранятся как NaN (для карт R²).
+    """
+
+    __slots__ = ('filename', 'fixed_y0', '_columns', '_size')
+
+    def __init__(self, filename='', fixed_y0=None, capacity=64):
+        self.filename = filename
+        self.fixed_y0 = fixed_y0
+        self._columns = {name: np.empty(capacity, dtype=FIT_DTYPE[name])
+                         for name in FIT_DTYPE.names}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, name):
+        """Столбец по имени (представление без копирования)"""
+        return self._columns[name][:self._size]
+
+    @property
+    def columns(self):
+        return FIT_DTYPE.names
+
+    def _grow(self):
+        capacity = max(2 * len(self._columns['t1']), 1)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def append(self, time_min, time_max, params=None, score=np.nan):
+        """Добавляет результат окна; params=None — подгонка не удалась"""
+        if self._size == len(self._columns['t1']):
+            self._grow()
+        i = self._size
+        for name, column in self._columns.items():
+            if name == 'Time_min':
+                column[i] = time_min
+            elif name == 'Time_max':
+                column[i] = time_max
+            elif name == 'Score':
+                column[i] = score
+            else:
+                value = None if params is None else params.get(name)
+                if value is None:
+                    column[i] = 0 if name in _INT_COLUMNS else np.nan
+                else:
+                    column[i] = value
+        self._size += 1
+
+    def best_index(self, key='R_squared', minimize=False):
+        """Индекс окна с максимальным (или минимальным) key; None, если всё NaN"""
+        values = self[key]
+        if len(values) == 0 or np.all(np.isnan(values)):
+            return None
+        return int(np.nanargmin(values) if minimize else np.nanargmax(values))
+
+    def record(self, index):
+        """Строка результата в виде словаря (формат CSV скриптов подгонки)"""
+        row = {'Filename': self.filename}
+        for name in self.columns:
+            value = self._columns[name][index].item()
+            row[name] = None if isinstance(value, float) and np.isnan(value) else value
+        if self.fixed_y0 is not None:
+            row['Fixed_y0'] = self.fixed_y0
+        return row
+
+    def best(self, key='R_squared', minimize=False):
+        """Лучшая подгонка как словарь или None"""
+        index = self.best_index(key, minimize)
+        return None if index is None else self.record(index)
+
+    def to_records(self):
+        """Структурированный массив numpy (копия)"""
+        records = np.empty(self._size, dtype=FIT_DTYPE)
+        for name in self.columns:
+            records[name] = self[name]
+        return records
+
+    def to_pandas(self):
+        """DataFrame по столбцам без копирования данных"""
+        import pandas as pd
+        return pd.DataFrame({name: self[name] for name in self.columns}, copy=False)
+
+    def to_parquet(self, path):
+        """Сохраняет в Parquet (нужен pyarrow)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.table({name: self[name] for name in self.columns})
+        table = table.replace_schema_metadata({'filename': self.filename,
+                                               'fixed_y0': repr(self.fixed_y0)})
+        pq.write_table(table, path)
+
+    def save(self, path):
+        """Сохраняет в .npz (без дополнительных зависимостей)"""
+        np.savez(path, filename=self.filename,
+                 fixed_y0=np.nan if self.fixed_y0 is None else self.fixed_y0,
+                 **{name: self[name] for name in self.columns})
+
+    @classmethod
+    def load(cls, path):
+        """Загружает результаты, сохранённые save()"""
+        with np.load(path) as data:
+            fixed_y0 = float(data['fixed_y0'])
+            results = cls(str(data['filename']), None if np.isnan(fixed_y0) else fixed_y0,
+                          capacity=len(data['t1']))
+            for name in FIT_DTYPE.names:
+                # Файлы старого формата могут не содержать новых столбцов
+                if name in data.files:
+                    results._columns[name][:] = data[name]
+                else:
+                    results._columns[name][:] = 0 if name in _INT_COLUMNS else np.nan
+            results._size = len(data['t1'])
+        return results
+
+    def surface(self, key='R_squared'):
+        """Карта key по сетке окон: (значения Time_min, значения Time_max, матрица)"""
+        time_min, row = np.unique(self['Time_min'], return_inverse=True)
+        time_max, col = np.unique(self['Time_max'], return_inverse=True)
+        grid = np.full((len(time_min), len(time_max)), np.nan)
+        grid[row, col] = self[key]
+        return time_min, time_max, grid
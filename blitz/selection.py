@@ -0,0 +1,202 @@
+import numpy as np
+
+# Критерии выбора окна подгонки. 'r2' — прежний максимум R² (склонен к
+# маленьким окнам и требует перебора всех окон); 'aicc' и 'chi2' считаются по
+# RSS, N и статистике Дарбина-Уотсона, которые решатель возвращает вместе с
+# параметрами, поэтому дополнительных проходов по данным не требуется.
+CRITERIA = ('chi2', 'aicc', 'r2')
+
+# Шаг (в точках) разностей для оценки шума. Отсчёты BLItz сглажены прибором
+# (соседние точки коррелированы, DW остатков ~0.3), и разности соседних
+# точек занижают дисперсию в 3-4 раза; на 5 точках (1 с) оценка выходит на плато.
+NOISE_LAG = 5
+
+
+def noise_variance(y, lag=NOISE_LAG):
+    """Оценка дисперсии шума по разностям точек через lag (один проход по кривой)
+
+    Нулевые разности (прибор повторил отсчёт) отбрасываются, а разброс
+    считается по MAD вокруг медианы, поэтому ни повторы, ни скачки и тренд
+    кривой не занижают и не завышают оценку.
+    """
+    y = np.asarray(y, dtype=float)
+    d = y[lag:] - y[:-lag]
+    d = d[d != 0]
+    if len(d) < 2:
+        return np.nan
+    sigma_d = 1.4826 * np.median(np.abs(d - np.median(d)))
+    return sigma_d ** 2 / 2
+
+
+def noise_dw(y, lag=NOISE_LAG):
+    """Статистика Дарбина-Уотсона самого шума прибора: 2·σ²(соседние)/σ²(через lag)
+
+    Для белого шума это 2, для сглаженных отсчётов BLItz — 0.3-0.5. Остатки
+    идеальной подгонки не могут быть «белее» шума, поэтому штраф за
+    автокорреляцию отсчитывается от этого уровня. Если оценить нельзя — 2.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.fmin(2.0, 2 * noise_variance(y, 1) / noise_variance(y, lag)))
+
+
+def fit_is_valid(t1, t1_error, r_squared, at_bound):
+    """Годна ли подгонка для выбора (скаляры или массивы; NaN погрешности не мешает)
+
+    Негодны: t1 упёрся в границу решателя (AtBound), t1 не определён
+    (погрешность не меньше самого t1) и R² <= 0 (модель не лучше среднего).
+    """
+    t1 = np.asarray(t1, dtype=float)
+    t1_error = np.asarray(t1_error, dtype=float)
+    r_squared = np.asarray(r_squared, dtype=float)
+    with np.errstate(invalid='ignore'):
+        return ~np.asarray(at_bound, dtype=bool) & (r_squared > 0) & ~(t1_error >= np.abs(t1))
+
+
+def window_score(criterion, rss, n, dw, n_params, noise_var=None, dw_weight=1.0,
+                 baseline_dw=2.0):
+    """Оценка окна (меньше — лучше); работает и со скалярами, и с массивами
+
+    aicc -- AICc / N = ln(RSS/N) + 2p/(N-p-1)
+    chi2 -- |ln χ²_red|, χ²_red = RSS/(N-p)/σ²: лучше всего окно, остатки
+            которого согласуются с шумом прибора (χ²_red ≈ 1)
+    К обоим добавляется штраф за автокорреляцию остатков сверх автокорреляции
+    шума (noise_dw): dw_weight * max(0, ln(baseline_dw / DW)). Он в тех же
+    логарифмических единицах, что и оценки, и равен нулю, пока остатки не
+    коррелированы сильнее самого шума.
+    """
+    rss = np.asarray(rss, dtype=float)
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if criterion == 'aicc':
+            base = np.log(rss / n) + 2 * n_params / (n - n_params - 1)
+        elif criterion == 'chi2':
+            base = np.abs(np.log(rss / (n - n_params) / noise_var))
+        else:
+            raise ValueError(f"Неизвестный критерий: {criterion}")
+        penalty = np.maximum(0, np.log(baseline_dw / np.asarray(dw, dtype=float)))
+        score = base + dw_weight * penalty
+    return np.where(n > n_params + 1, score, np.nan)
+
+
+class WindowSelection:
+    """Правила выбора окна: критерий, минимальное покрытие, ранняя остановка
+
+    min_coverage -- минимальная длительность окна как доля самого длинного
+                    окна-кандидата; более короткие окна не подгоняются.
+                    0.25 оставляет окно 0-30 с диссоциации и самое короткое
+                    окно ассоциации (time_max_fraction=0.25); 0 — все окна
+    margin       -- окна с оценкой не хуже лучшей более чем на margin
+                    равноценны, из них выбирается самое длинное (select_best).
+                    Разброс оценки на кривой из ~600 коррелированных отсчётов
+                    ~0.15, поэтому меньшие различия — шум, а без этого правила
+                    выбор смещается к самым коротким окнам
+    patience     -- остановить перебор, если лучшая оценка не улучшилась
+                    больше чем на tolerance за patience подгонок подряд
+                    (None — перебирать все окна, по умолчанию)
+    С ранней остановкой окна перебираются от длинных к коротким. Оценка по
+    длине окна не монотонна, поэтому остановка — приближение: на планшетах
+    BLItz при patience=10 она меняла выбранное окно и t1 относительно
+    полного перебора. Включать только когда скорость важнее точности.
+    """
+
+    def __init__(self, criterion='chi2', min_coverage=0.25, dw_weight=1.0,
+                 patience=None, tolerance=1e-3, margin=0.1):
+        if criterion not in CRITERIA:
+            raise ValueError(f"Критерий должен быть одним из {CRITERIA}")
+        self.criterion = criterion
+        self.min_coverage = min_coverage
+        self.dw_weight = dw_weight
+        self.patience = patience
+        self.tolerance = tolerance
+        self.margin = margin
+
+    def order(self, windows):
+        """Окна с достаточным покрытием, от длинных к коротким"""
+        if not windows:
+            return []
+        longest = max(time_max - time_min for time_min, time_max in windows)
+        kept = [w for w in windows if w[1] - w[0] >= self.min_coverage * longest]
+        if self.patience is None:
+            # Без ранней остановки порядок не важен — сохраняем исходный
+            return kept
+        return sorted(kept, key=lambda w: (w[0] - w[1], w[0]))
+
+    def score(self, params, n_params, noise_var, baseline_dw=2.0):
+        """Оценка одной подгонки (меньше — лучше; для 'r2' это −R²)
+
+        NaN — нет данных или подгонка негодна (fit_is_valid): такие окна
+        не выбираются ни одним критерием.
+        """
+        if params is None:
+            return np.nan
+        t1, t1_error, r_squared = (np.nan if params.get(name) is None else params[name]
+                                   for name in ('t1', 't1_error', 'R_squared'))
+        if not fit_is_valid(t1, t1_error, r_squared, bool(params.get('AtBound'))):
+            return np.nan
+        if self.criterion == 'r2':
+            return -r_squared
+        if params.get('RSS') is None or params.get('N') is None:
+            return np.nan
+        dw = params.get('DW')
+        return float(window_score(self.criterion, params['RSS'], params['N'],
+                                  baseline_dw if dw is None else dw, n_params,
+                                  noise_var, self.dw_weight, baseline_dw))
+
+    def plateau(self):
+        """Счётчик ранней остановки: вызывать с оценкой каждой подгонки"""
+        best = np.inf
+        stale = 0
+
+        def update(score):
+            nonlocal best, stale
+            if np.isnan(score):
+                return False
+            if score < best - self.tolerance:
+                best = score
+                stale = 0
+            else:
+                stale += 1
+            return self.patience is not None and stale >= self.patience
+
+        return update
+
+
+# Прежнее поведение скриптов: максимум R² по всем окнам без ограничений
+LEGACY_R2 = {'criterion': 'r2', 'min_coverage': 0, 'patience': None, 'margin': 0}
+
+
+def make_selection(selection=None):
+    """WindowSelection из объекта, имени критерия или словаря параметров (JSON)"""
+    if selection is None:
+        return WindowSelection()
+    if isinstance(selection, WindowSelection):
+        return selection
+    if isinstance(selection, str):
+        return WindowSelection(**LEGACY_R2) if selection == 'r2' else WindowSelection(selection)
+    return WindowSelection(**selection)
+
+
+def select_best(results, selection=None):
+    """Лучшее окно по Score или None, если годных окон нет
+
+    Из окон с оценкой в пределах selection.margin от лучшей берётся самое
+    длинное (при равной длине — с лучшей оценкой). По R² выбирается только
+    когда бэкенд не вернул RSS/N (оценку посчитать нельзя), и только среди
+    годных подгонок (fit_is_valid).
+    """
+    margin = make_selection(selection).margin
+    score = results['Score']
+    if len(score) and not np.all(np.isnan(score)):
+        with np.errstate(invalid='ignore'):
+            near = score <= np.nanmin(score) + margin
+        length = np.where(near, results['Time_max'] - results['Time_min'], -np.inf)
+        candidates = np.flatnonzero(length == length.max())
+        return results.record(int(candidates[np.argmin(score[candidates])]))
+    if not np.all(np.isnan(results['RSS'])):
+        return None
+    valid = fit_is_valid(results['t1'], results['t1_error'], results['R_squared'],
+                         results['AtBound'])
+    r_squared = np.where(valid, results['R_squared'], np.nan)
+    if len(r_squared) == 0 or np.all(np.isnan(r_squared)):
+        return None
+    return results.record(int(np.nanargmax(r_squared)))
@@ -0,0 +1,349 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Локальный сервис подгонки: HTTP API + очередь задач в SQLite + пул процессов.
+# Только стандартная библиотека; ядро подгонки импортируется по требованию
+# (в рабочих процессах и при первой проверке задачи).
+
+DEFAULT_DB = 'blitz_jobs.sqlite'
+PHASES = ('as', 'dis')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    n_traces INTEGER NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+)
+"""
+
+
+def job_id_for(request):
+    """Идентификатор задачи — хеш канонического JSON (одинаковые задачи совпадают)"""
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+def _is_number(value):
+    # json.loads пропускает NaN и Infinity — они не годятся для подгонки
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value))
+
+
+def validate_request(request):
+    """Проверяет задачу: {'phase', 'traces': [{'filename', 'time', 'binding'}], ...}
+
+    Бэкенд и ключи options сверяются с blitz.fitting (импорт при первой
+    проверке), чтобы ошибка возвращалась при постановке, а не в рабочем процессе.
+    """
+    import inspect
+    from blitz.fitting import BACKENDS, fit_association, fit_dissociation
+    from blitz.selection import make_selection
+
+    if not isinstance(request, dict):
+        raise ValueError("Задача должна быть JSON-объектом")
+    if request.get('phase') not in PHASES:
+        raise ValueError(f"phase должен быть одним из {PHASES}")
+    if request.get('backend', 'native') not in BACKENDS:
+        raise ValueError(f"backend должен быть одним из {tuple(BACKENDS)}")
+    traces = request.get('traces')
+    if not isinstance(traces, list) or not traces:
+        raise ValueError("traces должен быть непустым списком")
+    for trace in traces:
+        if not isinstance(trace, dict) or not {'time', 'binding'} <= trace.keys():
+            raise ValueError("Каждая кривая должна содержать time и binding")
+        for key in ('time', 'binding'):
+            values = trace[key]
+            if not isinstance(values, list) or not all(_is_number(v) for v in values):
+                raise ValueError(f"{key} должен быть списком конечных чисел")
+        if len(trace['time']) != len(trace['binding']):
+            raise ValueError("Длины time и binding не совпадают")
+    options = request.get('options', {})
+    if not isinstance(options, dict):
+        raise ValueError("options должен быть JSON-объектом")
+    fit_trace = fit_association if request['phase'] == 'as' else fit_dissociation
+    allowed = set(inspect.signature(fit_trace).parameters) - {'data', 'filename', 'backend'}
+    unknown = sorted(set(options) - allowed)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры options: {', '.join(unknown)} "
+                         f"(допустимы: {', '.join(sorted(allowed))})")
+    # Параметры выбора окна проверяются тем же кодом, что и в рабочем процессе
+    try:
+        make_selection(options.get('selection'))
+    except TypeError as e:
+        raise ValueError(f"Неверный options.selection: {e}") from None
+    return request
+
+
+def run_job(request):
+    """Выполняет задачу в рабочем процессе: лучшая подгонка для каждой кривой"""
+    import pandas as pd
+    from blitz.fitting import fit_association, fit_dissociation, get_backend
+    from blitz.selection import select_best
+
+    fit_trace = fit_association if request['phase'] == 'as' else fit_dissociation
+    backend = get_backend(request.get('backend', 'native'))
+    options = request.get('options', {})
+    results = []
+    try:
+        for i, trace in enumerate(request['traces']):
+            filename = trace.get('filename', f'trace_{i}')
+            data = pd.DataFrame({'Time (s)': trace['time'], 'Binding (nm)': trace['binding']})
+            windows = fit_trace(data, filename, backend, **options)
+            best = select_best(windows, options.get('selection'))
+            if best is None:
+                best = {'Filename': filename}
+            best['Windows'] = len(windows)
+            results.append(best)
+    finally:
+        close = getattr(backend, 'close', None)
+        if close is not None:
+            close()
+    return results
+
+
+class JobStore:
+    """Постоянная очередь задач в SQLite"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+            # Задачи, прерванные остановкой сервиса, возвращаются в очередь
+            self._conn.execute("UPDATE jobs SET status = 'queued', started = NULL "
+                               "WHERE status = 'running'")
+
+    def submit(self, request):
+        """Ставит задачу в очередь; повтор той же задачи возвращает существующую"""
+        job_id = job_id_for(request)
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None and row['status'] != 'failed':
+                return job_id, False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, request, n_traces, created) "
+                "VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(request), len(request['traces']), time.time()))
+        return job_id, True
+
+    def claim(self, limit):
+        """Забирает до limit задач из очереди (старые первыми)"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, request FROM jobs WHERE status = 'queued' ORDER BY created LIMIT ?",
+                (limit,)).fetchall()
+            now = time.time()
+            for row in rows:
+                self._conn.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?",
+                                   (now, row['id']))
+        return [(row['id'], json.loads(row['request'])) for row in rows]
+
+    def finish(self, job_id, result=None, error=None):
+        status = 'failed' if error is not None else 'done'
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? WHERE id = ?",
+                (status, None if result is None else json.dumps(result), error,
+                 time.time(), job_id))
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, result, error, n_traces, created, started, finished "
+                "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = None if job['result'] is None else json.loads(job['result'])
+        return job
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FittingService:
+    """Очередь + пул рабочих процессов + метрики"""
+
+    def __init__(self, db_path=DEFAULT_DB, workers=None, poll_interval=0.2,
+                 metrics_window=300):
+        self.store = JobStore(db_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.metrics_window = metrics_window
+        self._pool = None
+        self._running = 0
+        self._finished = deque()  # (время окончания, число кривых)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = time.time()
+
+    def _make_pool(self):
+        import multiprocessing
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def start(self):
+        self._pool = self._make_pool()
+        self._thread = threading.Thread(target=self._dispatch, name='blitz-dispatch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        self.store.close()
+
+    def submit(self, request):
+        job_id, created = self.store.submit(validate_request(request))
+        if created:
+            self._wakeup.set()
+        return job_id, created
+
+    def _dispatch(self):
+        """Передаёт задачи из очереди в пул, пока есть свободные процессы"""
+        while not self._stop.is_set():
+            with self._lock:
+                free = self.workers - self._running
+            if free > 0:
+                for job_id, request in self.store.claim(free):
+                    with self._lock:
+                        self._running += 1
+                    try:
+                        future = self._pool.submit(run_job, request)
+                    except BrokenProcessPool:
+                        # Рабочий процесс упал — пересоздаём пул
+                        self._pool.shutdown(wait=False)
+                        self._pool = self._make_pool()
+                        future = self._pool.submit(run_job, request)
+                    future.add_done_callback(
+                        lambda f, job_id=job_id, n=len(request['traces']): self._done(job_id, n, f))
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _done(self, job_id, n_traces, future):
+        if future.cancelled():
+            # Остановка сервиса: задача вернётся в очередь при следующем запуске
+            with self._lock:
+                self._running -= 1
+            return
+        error = future.exception()
+        if error is None:
+            self.store.finish(job_id, result=future.result())
+        else:
+            self.store.finish(job_id, error=f"{type(error).__name__}: {error}")
+        with self._lock:
+            self._running -= 1
+            self._finished.append((time.time(), n_traces))
+        self._wakeup.set()
+
+    def metrics(self):
+        """Глубина очереди и пропускная способность за последние metrics_window секунд"""
+        now = time.time()
+        with self._lock:
+            while self._finished and self._finished[0][0] < now - self.metrics_window:
+                self._finished.popleft()
+            jobs = len(self._finished)
+            traces = sum(n for _, n in self._finished)
+            running = self._running
+        window = min(self.metrics_window, now - self._started) or 1
+        counts = self.store.counts()
+        return {
+            'queue_depth': counts.get('queued', 0),
+            'running': running,
+            'workers': self.workers,
+            'jobs': counts,
+            'jobs_per_minute': 60 * jobs / window,
+            'traces_per_second': traces / window,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, code, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self._send(200, self.service.metrics())
+        elif self.path.startswith('/jobs/'):
+            job = self.service.store.get(self.path[len('/jobs/'):])
+            if job is None:
+                self._send(404, {'error': "Задача не найдена"})
+            else:
+                self._send(200, job)
+        else:
+            self._send(404, {'error': "Неизвестный путь"})
+
+    def do_POST(self):
+        if self.path != '/jobs':
+            self._send(404, {'error': "Неизвестный путь"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            job_id, created = self.service.submit(request)
+        except (ValueError, TypeError, json.JSONDecodeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+        job = self.service.store.get(job_id)
+        self._send(202 if created else 200,
+                   {'id': job_id, 'status': job['status'], 'duplicate': not created})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service, host='127.0.0.1', port=8765):
+    """Создаёт HTTP-сервер для сервиса (порт 0 — любой свободный)"""
+    handler = type('Handler', (_Handler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(host='127.0.0.1', port=8765, db_path=DEFAULT_DB, workers=None):
+    """Запускает сервис и обслуживает запросы до Ctrl+C"""
+    service = FittingService(db_path, workers)
+    service.start()
+    server = make_server(service, host, port)
+    print(f"Сервис подгонки: http://{host}:{server.server_address[1]} "
+          f"({service.workers} процессов, очередь {db_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import pandas as pd
+
+
+def split_trace(df):
+    """Делит кривую на ассоциацию (до 119.6 с) и диссоциацию (с 120 с), время с нуля"""
+    # Разделение данных
+    df_part1 = df[df['Time (s)'] <= 119.6].copy()
+    df_part2 = df[df['Time (s)'] >= 120].copy()
+
+    # Перезапись времени с нуля
+    df_part1['Time (s)'] = df_part1['Time (s)'] - df_part1['Time (s)'].iloc[0]
+    df_part2['Time (s)'] = round(df_part2['Time (s)'] - df_part2['Time (s)'].iloc[0], 2)
+
+    return df_part1, df_part2
+
+
+def split_folder(input_dir, output_dir_as, output_dir_dis):
+    """Делит все CSV из input_dir на *_as.csv и *_dis.csv"""
+    output_dir_as = Path(output_dir_as)
+    output_dir_dis = Path(output_dir_dis)
+    for csv_file in Path(input_dir).glob("*.csv"):
+        df = pd.read_csv(csv_file, header=0)
+        df_part1, df_part2 = split_trace(df)
+
+        # Формируем пути для сохранения
+        output_file_as = output_dir_as / f"{csv_file.stem}_as.csv"
+        output_file_dis = output_dir_dis / f"{csv_file.stem}_dis.csv"
+
+        # Сохраняем
+        df_part1.to_csv(output_file_as, index=False)
+        df_part2.to_csv(output_file_dis, index=False)
@@ -0,0 +1,61 @@
+import importlib
+import statistics
+import subprocess
+import sys
+import time
+
+# Модули, которые не должны загружаться ядром (только по требованию)
+HEAVY_MODULES = ('matplotlib', 'originpro', 'openpyxl')
+CORE_MODULES = ('blitz.preprocess', 'blitz.correction', 'blitz.split', 'blitz.fitting')
+
+
+def _worker_probe():
+    """То, что делает рабочий процесс при старте: импорт ядра"""
+    for name in CORE_MODULES:
+        importlib.import_module(name)
+
+
+def _time_command(args, repeat):
+    """Медиана времени выполнения команды в новом процессе интерпретатора"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _time_spawn(repeat):
+    """Медиана времени запуска рабочего процесса (spawn) с импортом ядра"""
+    import multiprocessing
+    ctx = multiprocessing.get_context('spawn')
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = ctx.Process(target=_worker_probe)
+        process.start()
+        process.join()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def heavy_modules_loaded_by_core():
+    """Возвращает тяжёлые модули, которые подтягивает импорт ядра"""
+    code = (
+        "import sys\n"
+        f"for name in {CORE_MODULES!r}: __import__(name)\n"
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    return output.split()
+
+
+def measure_startup(repeat=5):
+    """Измеряет задержку `--help`, импорт ядра и запуск рабочего процесса (секунды)"""
+    return {
+        'help': _time_command(['-m', 'blitz', '--help'], repeat),
+        'python': _time_command(['-c', 'pass'], repeat),
+        'core_import': _time_command(['-c', f"import {', '.join(CORE_MODULES)}"], repeat),
+        'worker_spawn': _time_spawn(repeat),
+    }
@@ -1,15 +1,13 @@
 import pandas as pd
-df = pd.read_csv('ZE18_1000_CL.csv', header=0)  # header=0 означает, что первая строка - заголовки
 
-# Разделение данных
-df_part1 = df[df['Time (s)'] <= 119.6].copy()
-df_part2 = df[df['Time (s)'] >= 120].copy()
+from blitz.split import split_trace
 
-# Перезапись времени с нуля
-df_part1['Time (s)'] = df_part1['Time (s)'] - df_part1['Time (s)'].iloc[0]
-df_part2['Time (s)'] = round(df_part2['Time (s)'] - df_part2['Time (s)'].iloc[0],2)
+if __name__ == '__main__':
+    df = pd.read_csv('ZE18_1000_CL.csv', header=0)  # header=0 означает, что первая строка - заголовки
 
-# Сохранение в CSV
-df_part1.to_csv('ZE18_1000_CL_as.csv', index=False)
-df_part2.to_csv('ZE18_1000_CL_dis.csv', index=False)
+    # Разделение данных
+    df_part1, df_part2 = split_trace(df)
 
+    # Сохранение в CSV
+    df_part1.to_csv('ZE18_1000_CL_as.csv', index=False)
+    df_part2.to_csv('ZE18_1000_CL_dis.csv', index=False)
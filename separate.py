@@ -1,27 +1,11 @@
-from pathlib import Path
-import pandas as pd
+from blitz.split import split_folder
 
 # Папка с исходными файлами
-input_dir = Path(r"D:\Python\Blitz\plots_Cl\all")
+input_dir = r"D:\Python\Blitz\plots_Cl\all"
 
 # Папки для сохранения результатов
-output_dir_as = Path(r"D:\Python\Blitz\plots_Cl\as")
-output_dir_dis = Path(r"D:\Python\Blitz\plots_Cl\dis")
-for csv_file in input_dir.glob("*.csv"):
-    df = pd.read_csv(csv_file, header=0)
+output_dir_as = r"D:\Python\Blitz\plots_Cl\as"
+output_dir_dis = r"D:\Python\Blitz\plots_Cl\dis"
 
-    # Разделение данных
-    df_part1 = df[df['Time (s)'] <= 119.6].copy()
-    df_part2 = df[df['Time (s)'] >= 120].copy()
-
-    # Перезапись времени с нуля
-    df_part1['Time (s)'] = df_part1['Time (s)'] - df_part1['Time (s)'].iloc[0]
-    df_part2['Time (s)'] = round(df_part2['Time (s)'] - df_part2['Time (s)'].iloc[0], 2)
-
-    # Формируем пути для сохранения
-    output_file_as = output_dir_as / f"{csv_file.stem}_as.csv"
-    output_file_dis = output_dir_dis / f"{csv_file.stem}_dis.csv"
-
-    # Сохраняем
-    df_part1.to_csv(output_file_as, index=False)
-    df_part2.to_csv(output_file_dis, index=False)
\ No newline at end of file
+if __name__ == '__main__':
+    split_folder(input_dir, output_dir_as, output_dir_dis)